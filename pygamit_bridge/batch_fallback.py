@@ -8,9 +8,14 @@ batch_fallback.py — Module 2b: makexp batch 文件回退生成器
 这使得 GAMIT 的 X-file 生成步骤能够正常完成。
 """
 
+import io
 import os
 import re
 import glob
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from .utils import iter_header_records
 
 # 接收机类型 → GAMIT 3 字符缩写映射
 RECEIVER_MAP = {
@@ -25,7 +30,23 @@ RECEIVER_MAP = {
     'ROGUE': 'ROG',
 }
 
+# _parse_rinex_header 需要的头部标签
+HEADER_LABELS = frozenset(['MARKER NAME', 'REC # / TYPE / VERS', 'ANT # / TYPE'])
+
+# 头部一次读取的字节数（RINEX 2 头部通常不足 2 KB）
+HEADER_READ_SIZE = 4096
+
+# RECEIVER_MAP 全部关键字编译为单个正则，一次扫描完成匹配
+RECEIVER_RE = re.compile('|'.join(map(re.escape, RECEIVER_MAP)))
+
+# 固件版本号（如 '5.4.0' → 5.4，'Nav 4.85' → 4.85）
+VERSION_RE = re.compile(r'(\d+\.\d+)')
+
+# 并发读取 RINEX 头部的最大线程数（头部读取以 I/O 等待为主）
+HEADER_READ_WORKERS = 8
 
+
+@lru_cache(maxsize=256)
 def _get_receiver_abbrev(rec_type):
     """将完整接收机类型名映射为 GAMIT 使用的 3 字符缩写。
 
@@ -35,13 +56,13 @@ def _get_receiver_abbrev(rec_type):
     Returns:
         3 字符缩写（如 'SEP'）
     """
-    rec_upper = rec_type.upper()
-    for key, abbrev in RECEIVER_MAP.items():
-        if key in rec_upper:
-            return abbrev
+    match = RECEIVER_RE.search(rec_type.upper())
+    if match:
+        return RECEIVER_MAP[match.group(0)]
     return rec_type[:3].upper()
 
 
+@lru_cache(maxsize=256)
 def _get_receiver_version(rec_version_str):
     """从固件版本字符串中提取数值版本号。
 
@@ -51,7 +72,7 @@ def _get_receiver_version(rec_version_str):
     Returns:
         浮点版本号（如 5.4）
     """
-    match = re.search(r'(\d+\.\d+)', rec_version_str)
+    match = VERSION_RE.search(rec_version_str)
     if match:
         return float(match.group(1))
     return 0.00
@@ -73,9 +94,16 @@ def _parse_rinex_header(filepath):
         'ant_type': '',
     }
 
-    with open(filepath, 'r', errors='replace') as f:
-        for line in f:
-            label = line[60:].strip() if len(line) > 60 else ''
+    with open(filepath, 'rb') as f:
+        head = f.read(HEADER_READ_SIZE)
+        if b'END OF HEADER' in head:
+            lines = head.decode('ascii', errors='replace').splitlines()
+        else:
+            # 头部超出首块：回退为逐行读取
+            f.seek(0)
+            lines = io.TextIOWrapper(f, errors='replace')
+
+        for _, label, line in iter_header_records(lines, HEADER_LABELS):
             if label == 'MARKER NAME':
                 info['station'] = line[0:4].strip().lower()
             elif label == 'REC # / TYPE / VERS':
@@ -83,8 +111,6 @@ def _parse_rinex_header(filepath):
                 info['rec_version'] = line[40:60].strip()
             elif label == 'ANT # / TYPE':
                 info['ant_type'] = line[20:40].strip()
-            elif label == 'END OF HEADER':
-                break
 
     return info
 
@@ -142,9 +168,12 @@ def generate_makex_batch(expt, year, doy, orbt='igsg',
         "(a4,1x,a4,1x,a3,1x,a1,2x,a3,1x,f5.2)",
     ]
 
-    # 为每个 RINEX 文件添加站点条目
-    for rinex_file in rinex_files:
-        info = _parse_rinex_header(rinex_file)
+    # 并发读取各站头部（map 保持文件顺序），逐个添加站点条目
+    workers = min(HEADER_READ_WORKERS, len(rinex_files))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        infos = list(pool.map(_parse_rinex_header, rinex_files))
+
+    for info in infos:
         if not info['station']:
             continue
 
@@ -5,6 +5,7 @@ cli.py — PyGAMIT-Bridge 统一命令行接口
 
     pygamit-bridge download  --station mcm4 --year 2025 --doy 1
     pygamit-bridge convert   --input file.rnx --output file.obs
+    pygamit-bridge convert   --inputs a.rnx,b.rnx --outputs a.obs,b.obs
     pygamit-bridge preprocess --year 2025 --doy 1 --data-dir ./data --expt-dir ./expt
     pygamit-bridge parse     --session-dir ./expt/2025001 --output results.csv
 """
@@ -34,16 +35,44 @@ def cmd_download(args):
             print(f"  [Products DOY {doy:03d}] {results}")
 
 
+def _report_convert(input_file, output_file, success):
+    """打印单个文件的转换结果"""
+    if success:
+        fsize = os.path.getsize(output_file)
+        print(f"[OK] {input_file} → {output_file} ({fsize // 1024}KB)")
+    else:
+        print(f"[FAIL] 转换失败: {input_file}")
+
+
 def cmd_convert(args):
     """convert 子命令处理"""
-    from .converter import convert_rinex3_to_rinex2
+    from .converter import (convert_rinex3_to_rinex2,
+                            convert_rinex3_to_rinex2_many)
+
+    if args.inputs:
+        inputs = args.inputs.split(',')
+        outputs = args.outputs.split(',') if args.outputs else []
+        if len(outputs) != len(inputs):
+            print("[FAIL] --inputs 与 --outputs 的文件数不一致")
+            sys.exit(1)
+
+        results = convert_rinex3_to_rinex2_many(
+            list(zip(inputs, outputs)), workers=args.workers,
+            reuse=args.reuse)
+        for input_file, output_file, success in zip(inputs, outputs, results):
+            _report_convert(input_file, output_file, success)
+        if not all(results):
+            sys.exit(1)
+        return
+
+    if not args.output:
+        print("[FAIL] 缺少 --output")
+        sys.exit(1)
 
-    success = convert_rinex3_to_rinex2(args.input, args.output)
-    if success:
-        fsize = os.path.getsize(args.output)
-        print(f"[OK] {args.input} → {args.output} ({fsize // 1024}KB)")
-    else:
-        print(f"[FAIL] 转换失败: {args.input}")
+    success = convert_rinex3_to_rinex2(args.input, args.output,
+                                       reuse=args.reuse)
+    _report_convert(args.input, args.output, success)
+    if not success:
         sys.exit(1)
 
 
@@ -101,23 +130,15 @@ def cmd_parse(args):
     # 导出
     if args.output:
         if args.output.endswith('.json'):
-            export_json(results, args.output)
+            export_json(results, args.output,
+                        indent=None if args.compact else 2)
         else:
             export_csv(results, args.output)
         print(f"\n  → Exported to {args.output}")
 
 
-def main():
-    """CLI 主入口"""
-    parser = argparse.ArgumentParser(
-        prog='pygamit-bridge',
-        description='PyGAMIT-Bridge: GAMIT/GLOBK 现代数据格式桥接工具包',
-    )
-    parser.add_argument('--version', action='version', version='0.1.0')
-    subparsers = parser.add_subparsers(dest='command', help='子命令')
-
-    # --- download ---
-    p_dl = subparsers.add_parser('download', help='下载 GNSS 数据和产品')
+def _add_download_args(p_dl):
+    """download 子命令参数"""
     p_dl.add_argument('--stations', required=True, help='站点列表(逗号分隔)')
     p_dl.add_argument('--year', type=int, required=True)
     p_dl.add_argument('--start-doy', type=int, default=1)
@@ -127,13 +148,22 @@ def main():
     p_dl.add_argument('--stations-only', action='store_true')
     p_dl.add_argument('--products-only', action='store_true')
 
-    # --- convert ---
-    p_cv = subparsers.add_parser('convert', help='RINEX 3 → RINEX 2 转换')
-    p_cv.add_argument('--input', '-i', required=True, help='RINEX 3 输入文件')
-    p_cv.add_argument('--output', '-o', required=True, help='RINEX 2 输出文件')
 
-    # --- preprocess ---
-    p_pp = subparsers.add_parser('preprocess', help='预处理数据用于 GAMIT')
+def _add_convert_args(p_cv):
+    """convert 子命令参数"""
+    cv_in = p_cv.add_mutually_exclusive_group(required=True)
+    cv_in.add_argument('--input', '-i', help='RINEX 3 输入文件')
+    cv_in.add_argument('--inputs', help='多个 RINEX 3 输入文件(逗号分隔)')
+    p_cv.add_argument('--output', '-o', help='RINEX 2 输出文件')
+    p_cv.add_argument('--outputs', help='与 --inputs 一一对应的输出文件(逗号分隔)')
+    p_cv.add_argument('--workers', type=int, default=None,
+                      help='批量转换的进程数（默认 CPU 核数）')
+    p_cv.add_argument('--reuse', action='store_true',
+                      help='输出文件不早于输入文件时跳过转换')
+
+
+def _add_preprocess_args(p_pp):
+    """preprocess 子命令参数"""
     p_pp.add_argument('--year', type=int, required=True)
     p_pp.add_argument('--doy', type=int, required=True)
     p_pp.add_argument('--data-dir', required=True, help='原始数据目录')
@@ -142,12 +172,41 @@ def main():
     p_pp.add_argument('--stations', default=None, help='站点过滤(逗号分隔)')
     p_pp.add_argument('--gg-dir', default=None, help='GAMIT 安装目录')
 
-    # --- parse ---
-    p_ps = subparsers.add_parser('parse', help='解析 GAMIT 输出')
+
+def _add_parse_args(p_ps):
+    """parse 子命令参数"""
     p_ps.add_argument('--session-dir', required=True, help='会话输出目录')
     p_ps.add_argument('--expt', default='anta', help='实验名前缀')
     p_ps.add_argument('--output', '-o', default=None,
                       help='导出路径 (.csv 或 .json)')
+    p_ps.add_argument('--compact', action='store_true',
+                      help='JSON 紧凑单行输出（大批量导出更快）')
+
+
+# 子命令表：名称 → (帮助文本, 参数注册函数, 处理函数)
+SUBCOMMANDS = {
+    'download': ('下载 GNSS 数据和产品', _add_download_args, cmd_download),
+    'convert': ('RINEX 3 → RINEX 2 转换', _add_convert_args, cmd_convert),
+    'preprocess': ('预处理数据用于 GAMIT', _add_preprocess_args, cmd_preprocess),
+    'parse': ('解析 GAMIT 输出', _add_parse_args, cmd_parse),
+}
+
+
+def main():
+    """CLI 主入口"""
+    parser = argparse.ArgumentParser(
+        prog='pygamit-bridge',
+        description='PyGAMIT-Bridge: GAMIT/GLOBK 现代数据格式桥接工具包',
+    )
+    parser.add_argument('--version', action='version', version='0.1.0')
+    subparsers = parser.add_subparsers(dest='command', help='子命令')
+
+    # 所有子命令都登记名称和帮助文本，但只为命令行实际选中的子命令注册参数
+    selected = sys.argv[1] if len(sys.argv) > 1 else None
+    for name, (help_text, add_args, _) in SUBCOMMANDS.items():
+        sub = subparsers.add_parser(name, help=help_text)
+        if name == selected:
+            add_args(sub)
 
     args = parser.parse_args()
 
@@ -155,12 +214,7 @@ def main():
         parser.print_help()
         sys.exit(0)
 
-    {
-        'download': cmd_download,
-        'convert': cmd_convert,
-        'preprocess': cmd_preprocess,
-        'parse': cmd_parse,
-    }[args.command](args)
+    SUBCOMMANDS[args.command][2](args)
 
 
 if __name__ == '__main__':
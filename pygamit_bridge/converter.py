@@ -17,6 +17,11 @@ import os
 import sys
 import shutil
 from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain
+
+from .utils import iter_header_records
 
 # RINEX3 → RINEX2 观测类型映射表
 # RINEX3: 3 字符 (C1C, L1C, S1C, D1C, ...)
@@ -44,11 +49,37 @@ OBS_MAPPING = {
 }
 
 
+# _parse_rinex3_header 需要处理的头部标签（第 61-80 列）；
+# COMMENT、SYS / PHASE SHIFT 等其余标签行只需一次集合查找即可跳过
+HEADER_LABELS = frozenset([
+    'RINEX VERSION / TYPE', 'MARKER NAME', 'MARKER NUMBER',
+    'OBSERVER / AGENCY', 'REC # / TYPE / VERS', 'ANT # / TYPE',
+    'APPROX POSITION XYZ', 'ANTENNA: DELTA H/E/N', 'SYS / # / OBS TYPES',
+    'INTERVAL', 'TIME OF FIRST OBS', 'TIME OF LAST OBS',
+])
+
+# RINEX3 观测记录布局：3 字符卫星号 + 每个观测值 16 字符 (F14.3 + LLI + SSI)
+SAT_ID_WIDTH = 3
+OBS_FIELD_WIDTH = 16
+
+# RINEX 2.11 头部中与输入无关的固定行
+RINEX2_VERSION_LINE = f"     2.11           OBSERVATION DATA    {'G':20s}RINEX VERSION / TYPE\n"
+RINEX2_PGM_LINE = f"{'pygamit-bridge':20s}{'':20s}{'':20s}PGM / RUN BY / DATE\n"
+RINEX2_WAVELENGTH_LINE = f"     1     1{'':48s}WAVELENGTH FACT L1/2\n"
+RINEX2_END_OF_HEADER_LINE = f"{'':60s}END OF HEADER\n"
+
+# RINEX2 epoch 头卫星列表续行前缀
+EPOCH_CONT_INDENT = b"\n" + b" " * 32
+
+# 输出文件写缓冲区大小（按大块写出，减少系统调用）
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+
 def _parse_rinex3_header(lines):
     """解析 RINEX3 文件头部，提取所有关键元数据。
 
     Args:
-        lines: 文件内容行列表
+        lines: 文件内容行列表（或行迭代器），读到 END OF HEADER 为止
 
     Returns:
         包含头部信息的字典
@@ -71,11 +102,10 @@ def _parse_rinex3_header(lines):
         'header_end_line': 0,
     }
 
-    i = 0
-    while i < len(lines):
-        line = lines[i]
-        label = line[60:].strip() if len(line) > 60 else ''
+    num_obs = 0
+    obs_types = []
 
+    for i, label, line in iter_header_records(lines, HEADER_LABELS):
         if label == 'RINEX VERSION / TYPE':
             header['version'] = line[0:9].strip()
             header['type'] = line[20:21].strip()
@@ -111,19 +141,16 @@ def _parse_rinex3_header(lines):
             except ValueError:
                 pass
         elif label == 'SYS / # / OBS TYPES':
-            # RINEX3 按系统分组的观测类型声明，可能有续行
-            sys_code = line[0:1]
-            num_obs = int(line[3:6].strip())
-            obs_types = line[7:60].split()
-            while len(obs_types) < num_obs and i + 1 < len(lines):
-                i += 1
-                next_line = lines[i]
-                next_label = next_line[60:].strip() if len(next_line) > 60 else ''
-                if next_label == 'SYS / # / OBS TYPES':
-                    obs_types.extend(next_line[7:60].split())
-                else:
-                    break
-            header['obs_types'][sys_code] = obs_types[:num_obs]
+            # RINEX3 按系统分组的观测类型声明；上一系统未满 num_obs 个
+            # 类型时，本行是其续行
+            if len(obs_types) < num_obs:
+                obs_types.extend(line[7:60].split())
+            else:
+                sys_code = line[0:1]
+                num_obs = int(line[3:6].strip())
+                obs_types = line[7:60].split()
+                header['obs_types'][sys_code] = obs_types
+            del obs_types[num_obs:]
         elif label == 'INTERVAL':
             try:
                 header['interval'] = float(line[0:10])
@@ -135,233 +162,271 @@ def _parse_rinex3_header(lines):
             header['time_last'] = line[0:60].strip()
         elif label == 'END OF HEADER':
             header['header_end_line'] = i
-            break
-
-        i += 1
 
     return header
 
 
-def _build_obs_type_mapping(header):
-    """构建 RINEX3→RINEX2 观测类型映射。
+@lru_cache(maxsize=64)
+def _map_obs_types(gps_types):
+    """按 GPS 观测类型声明计算 RINEX2 类型列表和列排列。
 
-    仅保留 GPS (G) 系统的观测类型，去重并保持顺序。
+    同型号接收机的观测类型声明高度重复，结果按声明元组缓存，
+    批量转换时每种声明只查一次 OBS_MAPPING。
 
     Args:
-        header: 解析后的头部字典
+        gps_types: RINEX3 GPS 观测类型元组
 
     Returns:
-        (rnx2_types, mapping) — RINEX2 类型列表和索引映射字典
+        (rnx2_types, src_cols) 元组对
     """
-    gps_types = header['obs_types'].get('G', [])
     rnx2_types = []
     seen = set()
-    mapping = {}
+    src_cols = []
 
     for idx, rnx3_type in enumerate(gps_types):
         rnx2_type = OBS_MAPPING.get(rnx3_type, None)
         if rnx2_type and rnx2_type not in seen:
             seen.add(rnx2_type)
             rnx2_types.append(rnx2_type)
-        mapping[idx] = rnx2_type
+            src_cols.append(idx)
+
+    return tuple(rnx2_types), tuple(src_cols)
 
-    return rnx2_types, mapping
+
+def _build_obs_type_mapping(header):
+    """构建 RINEX3→RINEX2 观测类型映射。
+
+    仅保留 GPS (G) 系统的观测类型，去重并保持顺序。
+
+    Args:
+        header: 解析后的头部字典
+
+    Returns:
+        (rnx2_types, src_cols) — RINEX2 类型列表，以及列索引排列
+        （RINEX2 第 k 列取自 RINEX3 第 src_cols[k] 列）
+    """
+    return _map_obs_types(tuple(header['obs_types'].get('G', ())))
 
 
 def _write_rinex2_header(f, header, rnx2_types):
-    """生成并写入 RINEX 2.11 格式头部。"""
-    # RINEX VERSION / TYPE
-    f.write(f"     2.11           OBSERVATION DATA    {'G':20s}RINEX VERSION / TYPE\n")
-    # PGM / RUN BY / DATE
-    f.write(f"{'pygamit-bridge':20s}{'':20s}{'':20s}PGM / RUN BY / DATE\n")
-    # MARKER NAME
-    f.write(f"{header['marker_name']:60s}MARKER NAME\n")
-    # MARKER NUMBER
-    if header['marker_number']:
-        f.write(f"{header['marker_number']:60s}MARKER NUMBER\n")
-    # OBSERVER / AGENCY
-    f.write(f"{header['observer']:20s}{header['agency']:40s}OBSERVER / AGENCY\n")
-    # REC # / TYPE / VERS
+    """生成并写入 RINEX 2.11 格式头部（整体拼接后一次写出）。"""
     r = header['receiver']
-    f.write(f"{r['serial']:20s}{r['type']:20s}{r['version']:20s}REC # / TYPE / VERS\n")
-    # ANT # / TYPE
     a = header['antenna']
-    f.write(f"{a['serial']:20s}{a['type']:20s}{'':20s}ANT # / TYPE\n")
-    # APPROX POSITION XYZ
     pos = header['approx_pos']
-    f.write(f"{pos[0]:14.4f}{pos[1]:14.4f}{pos[2]:14.4f}{'':18s}APPROX POSITION XYZ\n")
-    # ANTENNA: DELTA H/E/N
     delta = a['delta']
-    f.write(f"{delta[0]:14.4f}{delta[1]:14.4f}{delta[2]:14.4f}{'':18s}ANTENNA: DELTA H/E/N\n")
-    # WAVELENGTH FACT L1/2 (RINEX2 特有)
-    f.write(f"     1     1{'':48s}WAVELENGTH FACT L1/2\n")
+
+    out = [
+        RINEX2_VERSION_LINE,
+        RINEX2_PGM_LINE,
+        f"{header['marker_name']:60s}MARKER NAME\n",
+    ]
+    if header['marker_number']:
+        out.append(f"{header['marker_number']:60s}MARKER NUMBER\n")
+    out += [
+        f"{header['observer']:20s}{header['agency']:40s}OBSERVER / AGENCY\n",
+        f"{r['serial']:20s}{r['type']:20s}{r['version']:20s}REC # / TYPE / VERS\n",
+        f"{a['serial']:20s}{a['type']:20s}{'':20s}ANT # / TYPE\n",
+        f"{pos[0]:14.4f}{pos[1]:14.4f}{pos[2]:14.4f}{'':18s}APPROX POSITION XYZ\n",
+        f"{delta[0]:14.4f}{delta[1]:14.4f}{delta[2]:14.4f}{'':18s}ANTENNA: DELTA H/E/N\n",
+        RINEX2_WAVELENGTH_LINE,
+    ]
     # # / TYPES OF OBSERV（每行最多 9 个类型，每类型 6 字符宽）
     num = len(rnx2_types)
-    lines_needed = (num + 8) // 9
-    for line_idx in range(lines_needed):
-        if line_idx == 0:
-            obs_line = f"{num:6d}"
-        else:
-            obs_line = "      "
-        start = line_idx * 9
-        end = min(start + 9, num)
-        for j in range(start, end):
-            obs_line += f"{rnx2_types[j]:>6s}"
-        obs_line = obs_line.ljust(60)
-        obs_line += "# / TYPES OF OBSERV\n"
-        f.write(obs_line)
-    # INTERVAL
-    f.write(f"{header['interval']:10.3f}{'':50s}INTERVAL\n")
-    # TIME OF FIRST OBS
+    for start in range(0, num, 9):
+        prefix = f"{num:6d}" if start == 0 else " " * 6
+        types = ''.join([f"{t:>6s}" for t in rnx2_types[start:start + 9]])
+        out.append(f"{prefix + types:60s}# / TYPES OF OBSERV\n")
+    out.append(f"{header['interval']:10.3f}{'':50s}INTERVAL\n")
     if header['time_first']:
-        f.write(f"{header['time_first']:60s}TIME OF FIRST OBS\n")
-    # TIME OF LAST OBS
+        out.append(f"{header['time_first']:60s}TIME OF FIRST OBS\n")
     if header['time_last']:
-        f.write(f"{header['time_last']:60s}TIME OF LAST OBS\n")
-    # END OF HEADER
-    f.write(f"{'':60s}END OF HEADER\n")
+        out.append(f"{header['time_last']:60s}TIME OF LAST OBS\n")
+    out.append(RINEX2_END_OF_HEADER_LINE)
 
+    f.write(''.join(out).encode('ascii', errors='replace'))
 
-def _convert_data(lines, data_start, header, rnx2_types, mapping, outf):
+
+def _normalize_field(val):
+    """将 16 字节观测字段规整为 RINEX2 的 F14.3 + LLI + 信号强度。
+
+    数值部分右对齐到 14 位，缺失的 LLI / 信号强度补空格。
+    """
+    val = val.rstrip()
+    if len(val) >= 14:
+        return val.ljust(OBS_FIELD_WIDTH)
+    return val.rjust(14) + b'  '
+
+
+def _convert_data(lines, header, src_cols, outf):
     """将 RINEX3 观测数据记录转换为 RINEX2 格式。
 
     RINEX3: 每颗卫星占一行，'>' 前缀标记 epoch
     RINEX2: 传统多行格式，epoch 行包含卫星列表
-    """
-    gps_types = header['obs_types'].get('G', [])
-    i = data_start
 
-    while i < len(lines):
-        line = lines[i]
+    RINEX 按规范是纯 ASCII，数据段全程以 bytes 处理，不做编解码。
 
-        if line.startswith('>'):
-            try:
-                yr = int(line[2:6])
-                mo = int(line[7:9])
-                dy = int(line[10:12])
-                hr = int(line[13:15])
-                mn = int(line[16:18])
-                sc = float(line[18:29])
-                flag = int(line[29:32])
-                num_sats = int(line[32:35])
-            except (ValueError, IndexError):
-                i += 1
+    Args:
+        lines: 数据段的 bytes 行迭代器（通常是已读过头部的二进制文件对象）
+        header: 解析后的头部字典
+        src_cols: _build_obs_type_mapping 返回的列索引排列
+        outf: 二进制输出文件对象
+    """
+    gps_types = header['obs_types'].get('G', [])
+    record_width = SAT_ID_WIDTH + len(gps_types) * OBS_FIELD_WIDTH
+    # 列排列在整个文件内不变：预先把它折算成直接指向 RINEX2 各列源字段的
+    # 切片，记录只需切出实际输出的字段
+    field_slices = [
+        slice(SAT_ID_WIDTH + c * OBS_FIELD_WIDTH,
+              SAT_ID_WIDTH + (c + 1) * OBS_FIELD_WIDTH)
+        for c in src_cols
+    ]
+    lines = iter(lines)
+
+    for line in lines:
+        if not line.startswith(b'>'):
+            continue
+
+        try:
+            yr = int(line[2:6])
+            mo = int(line[7:9])
+            dy = int(line[10:12])
+            hr = int(line[13:15])
+            mn = int(line[16:18])
+            sc = float(line[18:29])
+            flag = int(line[29:32])
+            num_sats = int(line[32:35])
+        except (ValueError, IndexError):
+            continue
+
+        # 收集 GPS 卫星数据：记录补齐到定长后按预计算的列切片拆分
+        sats = []
+        sat_data = {}
+        for j in range(num_sats):
+            sat_line = next(lines, None)
+            if sat_line is None:
+                break
+            sat_id = sat_line[0:3].strip()
+            if not sat_id.startswith(b'G'):
                 continue
 
-            # 收集 GPS 卫星数据
-            sats = []
-            sat_data = {}
-            for j in range(num_sats):
-                i += 1
-                if i >= len(lines):
-                    break
-                sat_line = lines[i]
-                sat_id = sat_line[0:3].strip()
-                if not sat_id.startswith('G'):
-                    continue
-
-                values = []
-                for k in range(len(gps_types)):
-                    start_pos = 3 + k * 16
-                    end_pos = start_pos + 16
-                    if start_pos < len(sat_line):
-                        values.append(sat_line[start_pos:end_pos])
-                    else:
-                        values.append(' ' * 16)
-
-                sats.append(sat_id)
-                sat_data[sat_id] = values
-
-            if not sats:
-                i += 1
-                continue
+            record = sat_line.rstrip(b'\r\n').ljust(record_width)
+            sats.append(sat_id)
+            sat_data[sat_id] = [record[s] for s in field_slices]
+
+        if not sats:
+            continue
+
+        # RINEX2 epoch 头：卫星列表每行最多 12 颗，续行缩进 32 列
+        yr2 = yr % 100
+        sat_list = b''.join([sat.rjust(3) for sat in sats])
+        out = [
+            b" %2d %2d %2d %2d %2d%11.7f  %1d%3d"
+            % (yr2, mo, dy, hr, mn, sc, flag, len(sats))
+            + EPOCH_CONT_INDENT.join([sat_list[k:k + 36]
+                                      for k in range(0, len(sat_list), 36)])
+        ]
+
+        # 观测值（每行最多 5 个），已按 RINEX2 列顺序切出
+        for sat in sats:
+            fields = [_normalize_field(v) for v in sat_data[sat]]
+            for k in range(0, len(fields), 5):
+                out.append(b''.join(fields[k:k + 5]))
+
+        out.append(b'')
+        outf.write(b'\n'.join(out))
+
+
+def _is_up_to_date(input_file, output_file):
+    """输出文件存在且修改时间不早于输入文件时视为可复用。"""
+    try:
+        return os.stat(output_file).st_mtime >= os.stat(input_file).st_mtime
+    except OSError:
+        return False
 
-            # 写入 RINEX2 epoch 头
-            yr2 = yr % 100
-            epoch_hdr = (f" {yr2:2d} {mo:2d} {dy:2d} {hr:2d} {mn:2d}"
-                         f"{sc:11.7f}  {flag:1d}{len(sats):3d}")
-            for k, sat in enumerate(sats):
-                epoch_hdr += f"{sat:>3s}"
-                if (k + 1) % 12 == 0 and k + 1 < len(sats):
-                    epoch_hdr += "\n" + " " * 32
-            outf.write(epoch_hdr + "\n")
-
-            # 写入观测值（每行最多 5 个）
-            for sat in sats:
-                values = sat_data[sat]
-                rnx2_values = []
-                for rnx2_type in rnx2_types:
-                    found = False
-                    for idx, rnx3_type in enumerate(gps_types):
-                        if mapping.get(idx) == rnx2_type:
-                            if idx < len(values):
-                                rnx2_values.append(values[idx])
-                            else:
-                                rnx2_values.append(' ' * 16)
-                            found = True
-                            break
-                    if not found:
-                        rnx2_values.append(' ' * 16)
-
-                obs_line = ""
-                for k, val in enumerate(rnx2_values):
-                    val_str = val.rstrip() if len(val) > 0 else ''
-                    if len(val_str) >= 14:
-                        num_part = val_str[:14]
-                        lli = val_str[14:15] if len(val_str) > 14 else ' '
-                        sig = val_str[15:16] if len(val_str) > 15 else ' '
-                    elif len(val_str) > 0:
-                        num_part = f"{val_str:>14s}"
-                        lli = ' '
-                        sig = ' '
-                    else:
-                        num_part = ' ' * 14
-                        lli = ' '
-                        sig = ' '
-
-                    obs_line += f"{num_part}{lli}{sig}"
-                    if (k + 1) % 5 == 0:
-                        outf.write(obs_line + "\n")
-                        obs_line = ""
-
-                if obs_line:
-                    outf.write(obs_line + "\n")
-
-        i += 1
-
-
-def convert_rinex3_to_rinex2(input_file, output_file):
+
+def convert_rinex3_to_rinex2(input_file, output_file, reuse=False):
     """RINEX 3.x → RINEX 2.11 完整格式转换。
 
     如果输入文件已经是 RINEX 2 格式，直接复制。
+    转换结果先写入临时文件再原子替换，输出文件存在即代表转换完整。
 
     Args:
         input_file: RINEX 3.x 输入文件路径
         output_file: RINEX 2.11 输出文件路径
+        reuse: 为 True 时，若输出文件不早于输入文件则跳过转换
 
     Returns:
-        True 如果转换成功
+        True 如果转换成功（或复用了已有输出）
     """
-    with open(input_file, 'r', errors='replace') as f:
-        lines = f.readlines()
-
-    # 检查版本号
-    if not lines[0][0:9].strip().startswith('3'):
-        # 已经是 RINEX 2，直接复制
-        shutil.copy2(input_file, output_file)
+    if reuse and _is_up_to_date(input_file, output_file):
         return True
 
-    header = _parse_rinex3_header(lines)
-    rnx2_types, mapping = _build_obs_type_mapping(header)
+    with open(input_file, 'rb') as f:
+        first_line = f.readline()
 
-    if not rnx2_types:
-        return False
+        # 检查版本号
+        if not first_line[0:9].strip().startswith(b'3'):
+            # 已经是 RINEX 2，直接复制
+            shutil.copy2(input_file, output_file)
+            return True
 
-    with open(output_file, 'w') as outf:
-        _write_rinex2_header(outf, header, rnx2_types)
-        _convert_data(
-            lines, header['header_end_line'] + 1,
-            header, rnx2_types, mapping, outf
+        # 单遍处理：头部解析从文件流读到 END OF HEADER 为止（仅头部解码），
+        # 数据段紧接着从同一位置以 bytes 流式转换
+        header = _parse_rinex3_header(
+            line.decode('ascii', errors='replace')
+            for line in chain([first_line], f)
         )
-
+        rnx2_types, src_cols = _build_obs_type_mapping(header)
+
+        if not rnx2_types:
+            return False
+
+        part_file = output_file + '.part'
+        try:
+            with open(part_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as outf:
+                _write_rinex2_header(outf, header, rnx2_types)
+                _convert_data(f, header, src_cols, outf)
+        except BaseException:
+            if os.path.exists(part_file):
+                os.remove(part_file)
+            raise
+
+    os.replace(part_file, output_file)
     return True
+
+
+def convert_rinex3_to_rinex2_many(pairs, workers=None, reuse=False):
+    """多站 RINEX 3.x → RINEX 2.11 并行转换。
+
+    各站文件互相独立，按文件分发到多个进程（转换是纯 Python 计算，
+    多进程才能绕开 GIL）。单个文件转换出错（文件损坏、读写失败等）
+    只记为该文件失败，不影响其余文件。
+
+    Args:
+        pairs: (input_file, output_file) 元组序列
+        workers: 进程数，None 表示 CPU 核数，1 表示在当前进程串行
+        reuse: 传递给 convert_rinex3_to_rinex2 的 reuse 参数
+
+    Returns:
+        与 pairs 顺序一致的转换结果列表 (bool)
+    """
+    pairs = list(pairs)
+    if workers == 1 or len(pairs) <= 1:
+        results = []
+        for src, dst in pairs:
+            try:
+                results.append(convert_rinex3_to_rinex2(src, dst, reuse))
+            except Exception:
+                results.append(False)
+        return results
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(convert_rinex3_to_rinex2, src, dst, reuse)
+                   for src, dst in pairs]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:
+                results.append(False)
+    return results
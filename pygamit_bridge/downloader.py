@@ -2,29 +2,49 @@
 downloader.py — Module 1: CDDIS 智能数据下载器
 
 解决 2020 年后 CDDIS 强制 Earthdata 认证带来的数据获取问题：
-- 自动处理 Earthdata cookie 认证
+- 自动处理 Earthdata cookie 认证（进程内复用同一会话）
 - 检测 HTML 登录页面伪装的数据文件
 - 支持 IGS 长文件名和旧格式短文件名自动回退
 - 支持 RINEX 观测数据和精密产品（SP3/CLK/ERP/BRDC）下载
 """
 
 import os
-import subprocess
-
-from .utils import doy_to_date, doy_to_gps_week, is_gzip, is_html
+import json
+import atexit
+import netrc
+import random
+import shutil
+import socket
+import threading
+import time
+import io
+import http.client
+import http.cookiejar
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .utils import (doy_to_date, doy_to_gps_week, is_gzip, is_html_bytes,
+                    classify_download_cached, HTML_SNIFF_SIZE)
 
 # CDDIS 基础 URL
 CDDIS_BASE = "https://cddis.nasa.gov/archive/gnss/data/daily"
 CDDIS_PRODUCTS = "https://cddis.nasa.gov/archive/gnss/products"
 
-# wget Earthdata 认证参数
-WGET_AUTH = [
-    '--no-check-certificate',
-    '--load-cookies', os.path.expanduser('~/.urs_cookies'),
-    '--save-cookies', os.path.expanduser('~/.urs_cookies'),
-    '--auth-no-challenge',
-    '--keep-session-cookies',
-]
+# Earthdata 认证：账号密码取自 ~/.netrc，会话 cookie 持久化到
+# ~/.urs_cookies（Netscape 格式，与 wget --save-cookies 兼容）
+EARTHDATA_HOST = 'urs.earthdata.nasa.gov'
+URS_COOKIES = os.path.expanduser('~/.urs_cookies')
+
+# 流式写盘的块大小
+DOWNLOAD_CHUNK_SIZE = 1 << 16
+
+# 持久连接上，不超过此大小的错误/重定向响应体预先读入内存，
+# 连接可立即复用（更大的或分块传输的未读完响应则重新建连）
+KEEPALIVE_BUFFER_SIZE = 1 << 16
+
+# 并发下载线程数上限（避免对 CDDIS 建立过多并发连接）
+DOWNLOAD_WORKERS = 8
 
 # 常见 IGS 站点国家代码（用于构造 RINEX3 长文件名）
 COUNTRY_CODES = [
@@ -32,13 +52,211 @@ COUNTRY_CODES = [
     'NZL', 'NOR', 'DEU', 'GBR', 'ARG', 'RUS', 'CHN',
 ]
 
+# 临时性失败重试：最多重试次数、退避基数/抖动/上限（秒）
+DOWNLOAD_RETRIES = 3
+RETRY_BACKOFF = 0.5
+RETRY_JITTER = 0.5
+RETRY_MAX_DELAY = 30
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# 可重试的网络异常：超时、连接拒绝/重置/中断、HTTP 协议层传输中断。
+# 本地写盘失败（权限、磁盘满）与证书校验失败不在此列，立即失败
+RETRY_EXCEPTIONS = (socket.timeout, TimeoutError, ConnectionError,
+                    http.client.HTTPException)
+
+# 站点 → 国家代码缓存：站点的国家代码长期不变，命中一次后直接复用
+STATION_CC_CACHE = os.path.expanduser('~/.cache/pygamit_bridge/station_cc.json')
+# 缓存代码连续多少天未命中后失效
+COUNTRY_CODE_MAX_MISSES = 2
+
 # 最小有效文件大小阈值
 MIN_RINEX_SIZE = 5000   # RINEX 文件至少几 KB
 MIN_PRODUCT_SIZE = 1000  # 产品文件至少 1 KB
 
 
-def _wget_download(url, output_file, timeout=120):
-    """使用 wget 下载单个文件（带 Earthdata 认证）。
+class _KeepAliveHandler(urllib.request.HTTPSHandler, urllib.request.HTTPHandler):
+    """复用持久连接的 urllib HTTP/HTTPS 处理器。
+
+    urllib 自带处理器每个请求后都关闭连接，每个 HEAD/GET 都要重新
+    TCP + TLS 握手。这里按主机（CDDIS 与 URS 重定向主机）维护一个
+    http.client 连接池，所有下载线程共用；cookie、重定向、认证仍由
+    opener 的其他处理器负责。连接上的响应读完后才能被下一个请求取用，
+    未读完就被关闭（如嗅探到 HTML 提前放弃）的连接丢弃重建；空闲连接
+    已被服务器断开时重连并重发一次。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pool = {}
+        self._pool_lock = threading.Lock()
+
+    def http_open(self, req):
+        return self._keepalive_open(http.client.HTTPConnection, req)
+
+    def https_open(self, req):
+        return self._keepalive_open(http.client.HTTPSConnection, req,
+                                    context=self._context)
+
+    def _acquire(self, key):
+        """从池中取出一条空闲连接，没有则返回 None。"""
+        with self._pool_lock:
+            entries = self._pool.get(key, [])
+            for entry in list(entries):
+                conn, pending = entry
+                if _response_consumed(pending):
+                    entries.remove(entry)
+                    return conn
+                if pending.isclosed():
+                    # 响应未读完即被关闭，连接上残留数据，不可复用
+                    entries.remove(entry)
+                    conn.close()
+        return None
+
+    def _keepalive_open(self, conn_class, req, **conn_args):
+        if req._tunnel_host:
+            # 经代理隧道的请求走 urllib 原有逻辑
+            return self.do_open(conn_class, req, **conn_args)
+
+        key = (conn_class, req.host)
+        conn = self._acquire(key)
+        if conn is None:
+            conn = conn_class(req.host, timeout=req.timeout, **conn_args)
+
+        headers = dict(req.unredirected_hdrs)
+        headers.update({k: v for k, v in req.headers.items()
+                        if k not in headers})
+        headers = {name.title(): val for name, val in headers.items()}
+
+        for attempt in range(2):
+            reused = conn.sock is not None
+            if req.timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                conn.timeout = req.timeout
+                if reused:
+                    conn.sock.settimeout(req.timeout)
+            try:
+                conn.request(req.get_method(), req.selector, req.data, headers,
+                             encode_chunked=req.has_header('Transfer-encoding'))
+                resp = conn.getresponse()
+                break
+            except ConnectionError as e:
+                # RemoteDisconnected / BrokenPipeError：空闲连接已被服务器关闭
+                conn.close()
+                if not reused or attempt:
+                    raise urllib.error.URLError(e)
+            except OSError as e:
+                conn.close()
+                raise urllib.error.URLError(e)
+            except BaseException:
+                conn.close()
+                raise
+
+        # 小的错误/重定向响应体读入内存，连接立即可被复用
+        if (resp.status >= 300 and not resp.chunked
+                and resp.length is not None
+                and resp.length <= KEEPALIVE_BUFFER_SIZE):
+            body = resp.read()
+            resp.fp = io.BytesIO(body)
+            resp.length = len(body)
+            pending = None
+        else:
+            pending = resp
+        if conn.sock is not None:
+            with self._pool_lock:
+                self._pool.setdefault(key, []).append((conn, pending))
+
+        resp.url = req.get_full_url()
+        resp.msg = resp.reason
+        return resp
+
+
+def _response_consumed(resp):
+    """判断连接上的上一个响应是否已读完（连接可发下一个请求）。"""
+    return resp is None or (not resp.chunked and resp.length == 0)
+
+
+# 进程内共享的 Earthdata 会话（首次下载时创建，可被多个下载线程共用）
+_cookie_jar = None
+_opener = None
+_opener_lock = threading.Lock()
+
+
+def _get_opener():
+    """返回进程内共享的 Earthdata 认证 opener。
+
+    cookie 罐和认证信息只加载一次，之后所有下载复用同一会话，
+    Earthdata 登录重定向只需在首个请求时走一遍；底层连接按主机
+    保持长连接（见 _KeepAliveHandler）。cookie 在进程退出时
+    写回 ~/.urs_cookies。
+    """
+    global _opener
+    with _opener_lock:
+        if _opener is None:
+            _opener = _build_opener()
+            atexit.register(_save_cookies)
+    return _opener
+
+
+def _build_opener():
+    """创建带 cookie 罐和 ~/.netrc 认证信息的 urllib opener。"""
+    global _cookie_jar
+    _cookie_jar = http.cookiejar.MozillaCookieJar(URS_COOKIES)
+    try:
+        _cookie_jar.load(ignore_discard=True, ignore_expires=True)
+    except (OSError, http.cookiejar.LoadError):
+        pass
+
+    password_mgr = urllib.request.HTTPPasswordMgrWithDefaultRealm()
+    try:
+        auth = netrc.netrc().authenticators(EARTHDATA_HOST)
+    except (OSError, netrc.NetrcParseError):
+        auth = None
+    if auth:
+        password_mgr.add_password(None, f"https://{EARTHDATA_HOST}",
+                                  auth[0], auth[2])
+
+    return urllib.request.build_opener(
+        _KeepAliveHandler(),
+        urllib.request.HTTPBasicAuthHandler(password_mgr),
+        urllib.request.HTTPCookieProcessor(_cookie_jar),
+    )
+
+
+def _save_cookies():
+    """将会话 cookie 写回 ~/.urs_cookies，供后续进程复用。"""
+    try:
+        _cookie_jar.save(ignore_discard=True, ignore_expires=True)
+    except OSError:
+        pass
+
+
+def _retry_delay(attempt, retry_after=None):
+    """计算第 attempt 次重试前的等待秒数（指数退避 + 随机抖动）。"""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), RETRY_MAX_DELAY)
+    return RETRY_BACKOFF * (2 ** attempt) + random.uniform(0, RETRY_JITTER)
+
+
+def _classify_error(exc):
+    """判断请求异常是否为可重试的临时性失败（HEAD 与 GET 共用）。
+
+    Args:
+        exc: 请求过程中捕获的异常
+
+    Returns:
+        (是否可重试, Retry-After 响应头) 元组
+    """
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code in RETRY_STATUS_CODES, exc.headers.get('Retry-After')
+    if isinstance(exc, urllib.error.URLError):
+        exc = exc.reason
+    return isinstance(exc, RETRY_EXCEPTIONS), None
+
+
+def _http_download(url, output_file, timeout=120):
+    """下载单个文件（复用 Earthdata 认证会话，流式写盘）。
+
+    服务器繁忙（429 / 5xx）、超时、连接中断属于临时性失败，按指数退避
+    重试最多 DOWNLOAD_RETRIES 次；404 等其他 HTTP 错误视为文件不存在，
+    本地写盘失败、证书校验失败等也不重试，立即返回。
 
     Args:
         url: 下载 URL
@@ -48,27 +266,165 @@ def _wget_download(url, output_file, timeout=120):
     Returns:
         True 如果下载成功且文件有效
     """
-    try:
-        result = subprocess.run(
-            ['wget', '-q'] + WGET_AUTH + ['-O', output_file, url],
-            capture_output=True, timeout=timeout
-        )
-        if result.returncode == 0 and os.path.exists(output_file):
-            fsize = os.path.getsize(output_file)
-            # 检查是否是 HTML 登录页面伪装的假文件
-            if fsize > MIN_PRODUCT_SIZE and not is_html(output_file):
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        retry_after = None
+        try:
+            with _get_opener().open(url, timeout=timeout) as resp:
+                # 检查是否是 HTML 登录页面伪装的假文件：只看响应开头，
+                # 识别出来即放弃，不再接收剩余内容
+                head = resp.read(HTML_SNIFF_SIZE)
+                if is_html_bytes(head):
+                    return False
+                with open(output_file, 'wb') as f:
+                    f.write(head)
+                    shutil.copyfileobj(resp, f, DOWNLOAD_CHUNK_SIZE)
+            if os.path.getsize(output_file) > MIN_PRODUCT_SIZE:
                 return True
-            # 文件太小或是 HTML，删除
-            os.remove(output_file)
-    except subprocess.TimeoutExpired:
-        if os.path.exists(output_file):
+            # 文件太小，删除
             os.remove(output_file)
-    except Exception:
+            return False
+        except Exception as e:
+            retryable, retry_after = _classify_error(e)
+            if not retryable:
+                break
         if os.path.exists(output_file):
             os.remove(output_file)
+        if attempt < DOWNLOAD_RETRIES:
+            time.sleep(_retry_delay(attempt, retry_after))
+
+    if os.path.exists(output_file):
+        os.remove(output_file)
     return False
 
 
+_station_cc = None
+_station_cc_lock = threading.Lock()
+
+
+def _load_station_cc():
+    """加载站点 → {'cc': 国家代码, 'misses': 连续未命中天数} 缓存（需持锁调用）。"""
+    global _station_cc
+    if _station_cc is None:
+        try:
+            with open(STATION_CC_CACHE) as f:
+                _station_cc = json.load(f)
+        except (OSError, ValueError):
+            _station_cc = {}
+    return _station_cc
+
+
+def _save_station_cc():
+    """把站点国家代码缓存写回文件（写临时文件后原子替换，需持锁调用）。"""
+    try:
+        os.makedirs(os.path.dirname(STATION_CC_CACHE), exist_ok=True)
+        tmp_path = STATION_CC_CACHE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(_station_cc, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, STATION_CC_CACHE)
+    except OSError:
+        pass
+
+
+def _cached_country_code(station_upper):
+    """返回缓存中站点的国家代码，未缓存返回 None。"""
+    with _station_cc_lock:
+        entry = _load_station_cc().get(station_upper)
+    return entry.get('cc') if isinstance(entry, dict) else None
+
+
+def _remember_country_code(station_upper, cc):
+    """记录站点的国家代码（命中），连续未命中计数清零。"""
+    with _station_cc_lock:
+        cache = _load_station_cc()
+        entry = {'cc': cc, 'misses': 0}
+        if cache.get(station_upper) == entry:
+            return
+        cache[station_upper] = entry
+        _save_station_cc()
+
+
+def _record_country_code_miss(station_upper):
+    """记录缓存的国家代码当天未命中（且其余代码也未命中）。
+
+    连续未命中达到 COUNTRY_CODE_MAX_MISSES 天即移除该站缓存，
+    此后回到全量探测，避免过期代码每天多浪费一次请求。
+    """
+    with _station_cc_lock:
+        cache = _load_station_cc()
+        entry = cache.get(station_upper)
+        if not isinstance(entry, dict):
+            return
+        misses = entry.get('misses', 0) + 1
+        if misses >= COUNTRY_CODE_MAX_MISSES:
+            del cache[station_upper]
+        else:
+            cache[station_upper] = {'cc': entry.get('cc'), 'misses': misses}
+        _save_station_cc()
+
+
+def _head_exists(url, min_size, timeout=30):
+    """HEAD 探测远端文件是否存在，只取响应头、不下载内容。
+
+    Earthdata 重定向链上 urllib 会把 HEAD 改为 GET，此时同样只读响应头
+    即关闭连接，登录页正文不会被完整传输。临时性失败与 _http_download
+    一样按指数退避重试。
+
+    Args:
+        url: 文件 URL
+        min_size: 有效文件的最小字节数
+        timeout: 超时秒数
+
+    Returns:
+        True 如果远端是大小合理的非 HTML 文件（无 Content-Length 时也视为存在）；
+        False 如果文件不存在或无效；重试耗尽仍失败时返回 None（无法判断）
+    """
+    request = urllib.request.Request(url, method='HEAD')
+    for attempt in range(DOWNLOAD_RETRIES + 1):
+        try:
+            with _get_opener().open(request, timeout=timeout) as resp:
+                if 'html' in resp.headers.get('Content-Type', ''):
+                    return False
+                length = resp.headers.get('Content-Length')
+                return length is None or int(length) > min_size
+        except Exception as e:
+            retryable, retry_after = _classify_error(e)
+            if not retryable:
+                return False
+        if attempt < DOWNLOAD_RETRIES:
+            time.sleep(_retry_delay(attempt, retry_after))
+    return None
+
+
+def _download_first(candidates, output_dir, min_size):
+    """在互斥的候选文件中找到存在的那个并下载。
+
+    先并发 HEAD 探测全部候选（如同一站点的不同国家代码），
+    只对探测命中或无法判断的候选发起 GET，命中后取消其余尚未开始的探测。
+
+    Args:
+        candidates: (文件名, URL) 列表
+        output_dir: 输出目录
+        min_size: 有效文件的最小字节数
+
+    Returns:
+        成功的文件名，全部失败返回 None
+    """
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        futures = {
+            pool.submit(_head_exists, url, min_size): (fname, url)
+            for fname, url in candidates
+        }
+        for future in as_completed(futures):
+            if future.result() is False:
+                continue
+            fname, url = futures[future]
+            if _http_download(url, os.path.join(output_dir, fname)):
+                for other in futures:
+                    other.cancel()
+                return fname
+    return None
+
+
 def download_rinex(station, year, doy, output_dir):
     """下载单站单日 RINEX 观测数据。
 
@@ -92,41 +448,106 @@ def download_rinex(station, year, doy, output_dir):
     os.makedirs(output_subdir, exist_ok=True)
 
     # 检查已有有效文件
-    for f in os.listdir(output_subdir):
-        fp = os.path.join(output_subdir, f)
-        if f.startswith(station_upper) and f.endswith('.crx.gz'):
-            if os.path.getsize(fp) > MIN_RINEX_SIZE and is_gzip(fp):
-                return f"EXISTS: {f}"
-            else:
-                os.remove(fp)
+    with os.scandir(output_subdir) as it:
+        for entry in it:
+            f = entry.name
+            if f.startswith(station_upper) and f.endswith('.crx.gz'):
+                st = entry.stat()
+                if (st.st_size > MIN_RINEX_SIZE
+                        and classify_download_cached(entry.path, st) == 'gzip'):
+                    return f"EXISTS: {f}"
+                else:
+                    os.remove(entry.path)
 
     # 策略 1: RINEX3 长文件名 + 各种国家代码
     url_base = f"{CDDIS_BASE}/{year}/{doy_str}/{yr2}d/"
-    for cc in COUNTRY_CODES:
-        fname = f"{station_upper}00{cc}_R_{year}{doy_str}0000_01D_30S_MO.crx.gz"
-        url = url_base + fname
+    long_names = {
+        cc: f"{station_upper}00{cc}_R_{year}{doy_str}0000_01D_30S_MO.crx.gz"
+        for cc in COUNTRY_CODES
+    }
+
+    # 先直接下载缓存的国家代码，失败再探测其余代码
+    cached_cc = _cached_country_code(station_upper)
+    if cached_cc in long_names:
+        fname = long_names.pop(cached_cc)
         output_file = os.path.join(output_subdir, fname)
-        if _wget_download(url, output_file):
+        if _http_download(url_base + fname, output_file):
+            _remember_country_code(station_upper, cached_cc)
             fsize = os.path.getsize(output_file)
             return f"OK: {fname} ({fsize // 1024}KB)"
 
+    # 并发 HEAD 探测，只下载命中者
+    candidates = [(fname, url_base + fname) for fname in long_names.values()]
+    fname = _download_first(candidates, output_subdir, MIN_RINEX_SIZE)
+    if fname:
+        cc = next(cc for cc, name in long_names.items() if name == fname)
+        _remember_country_code(station_upper, cc)
+        fsize = os.path.getsize(os.path.join(output_subdir, fname))
+        return f"OK: {fname} ({fsize // 1024}KB)"
+    if cached_cc is not None:
+        _record_country_code_miss(station_upper)
+
     # 策略 2: 旧格式短文件名
     url_short_base = f"{CDDIS_BASE}/{year}/{doy_str}/{yr2}o/"
     for ext in ['.gz', '.Z']:
         short_name = f"{station}{doy_str}0.{yr2}d{ext}"
         url = url_short_base + short_name
         output_file = os.path.join(output_subdir, short_name)
-        if _wget_download(url, output_file):
+        if _http_download(url, output_file):
             fsize = os.path.getsize(output_file)
             return f"OK: {short_name} ({fsize // 1024}KB)"
 
     return f"FAIL: {station} {year} {doy_str}"
 
 
+def _fetch_product(products_url, output_subdir, name_new, name_old):
+    """下载单个精密产品：先试长文件名，失败后回退短文件名。
+
+    Returns:
+        状态字符串
+    """
+    for fname in [name_new, name_old]:
+        output_file = os.path.join(output_subdir, fname)
+
+        # 检查已有有效文件
+        if os.path.exists(output_file) and os.path.getsize(output_file) > MIN_PRODUCT_SIZE:
+            if is_gzip(output_file) or output_file.endswith('.Z'):
+                return f"EXISTS: {fname}"
+            else:
+                os.remove(output_file)
+
+        url = products_url + fname
+        if _http_download(url, output_file):
+            fsize = os.path.getsize(output_file)
+            return f"OK: {fname} ({fsize // 1024}KB)"
+
+    return f"FAIL: {name_old.split('.')[0]}"
+
+
+def _fetch_brdc(year, doy_str, yr2, output_subdir):
+    """下载广播星历（.gz 优先，回退 .Z）。
+
+    Returns:
+        状态字符串
+    """
+    brdc_name = f"brdc{doy_str}0.{yr2}n.gz"
+    brdc_out = os.path.join(output_subdir, brdc_name)
+    if os.path.exists(brdc_out) and os.path.getsize(brdc_out) > MIN_PRODUCT_SIZE:
+        return "EXISTS: BRDC"
+
+    for bn in [brdc_name, f"brdc{doy_str}0.{yr2}n.Z"]:
+        url = f"{CDDIS_BASE}/{year}/{doy_str}/{yr2}n/{bn}"
+        if _http_download(url, brdc_out):
+            fsize = os.path.getsize(brdc_out)
+            return f"OK: BRDC ({fsize // 1024}KB)"
+    return "FAIL: BRDC"
+
+
 def download_products(year, doy, output_dir):
     """下载 IGS 精密产品 (SP3, CLK, ERP) 和广播星历。
 
     自动尝试 2022 年后的长文件名格式，失败后回退至旧短文件名。
+    各产品互相独立，并发下载。
 
     Args:
         year: 4 位年份
@@ -134,7 +555,7 @@ def download_products(year, doy, output_dir):
         output_dir: 产品输出根目录
 
     Returns:
-        结果列表，每个元素为状态字符串
+        结果列表，每个元素为状态字符串（顺序为 SP3, CLK, ERP, BRDC）
     """
     gps_week, dow = doy_to_gps_week(year, doy)
     doy_str = f"{doy:03d}"
@@ -155,47 +576,13 @@ def download_products(year, doy, output_dir):
          f"igs{gps_week}7.erp.Z"),
     ]
 
-    results = []
-
-    for name_new, name_old in product_pairs:
-        downloaded = False
-        for fname in [name_new, name_old]:
-            output_file = os.path.join(output_subdir, fname)
-
-            # 检查已有有效文件
-            if os.path.exists(output_file) and os.path.getsize(output_file) > MIN_PRODUCT_SIZE:
-                if is_gzip(output_file) or output_file.endswith('.Z'):
-                    results.append(f"EXISTS: {fname}")
-                    downloaded = True
-                    break
-                else:
-                    os.remove(output_file)
-
-            url = products_url + fname
-            if _wget_download(url, output_file):
-                fsize = os.path.getsize(output_file)
-                results.append(f"OK: {fname} ({fsize // 1024}KB)")
-                downloaded = True
-                break
-
-        if not downloaded:
-            results.append(f"FAIL: {name_old.split('.')[0]}")
-
-    # 广播星历
-    brdc_name = f"brdc{doy_str}0.{yr2}n.gz"
-    brdc_out = os.path.join(output_subdir, brdc_name)
-    if os.path.exists(brdc_out) and os.path.getsize(brdc_out) > MIN_PRODUCT_SIZE:
-        results.append(f"EXISTS: BRDC")
-    else:
-        brdc_downloaded = False
-        for bn in [brdc_name, f"brdc{doy_str}0.{yr2}n.Z"]:
-            url = f"{CDDIS_BASE}/{year}/{doy_str}/{yr2}n/{bn}"
-            if _wget_download(url, brdc_out):
-                fsize = os.path.getsize(brdc_out)
-                results.append(f"OK: BRDC ({fsize // 1024}KB)")
-                brdc_downloaded = True
-                break
-        if not brdc_downloaded:
-            results.append("FAIL: BRDC")
-
-    return results
+    with ThreadPoolExecutor(max_workers=len(product_pairs) + 1) as pool:
+        futures = [
+            pool.submit(_fetch_product, products_url, output_subdir,
+                        name_new, name_old)
+            for name_new, name_old in product_pairs
+        ]
+        # 广播星历
+        futures.append(pool.submit(_fetch_brdc, year, doy_str, yr2,
+                                   output_subdir))
+        return [future.result() for future in futures]
@@ -16,15 +16,70 @@ import glob
 import gzip
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from .utils import doy_to_gps_week, station_name_short
-from .converter import convert_rinex3_to_rinex2
+from .converter import convert_rinex3_to_rinex2_many
+
+# crx2rnx 候选命令（PATH 中的命令名，及常见安装路径）与超时秒数
+CRX2RNX_CANDIDATES = ('CRX2RNX', 'crx2rnx',
+                      '~/gg/bin/crx2rnx', '/usr/local/bin/crx2rnx')
+CRX2RNX_TIMEOUT = 60
+
+# 并发解压的线程数（gzip 与 crx2rnx 子进程均不占用 GIL）
+DECOMPRESS_WORKERS = 8
+
+# gzip 解压的拷贝缓冲区大小，大块读写减少 Python 层调用次数
+GUNZIP_BUFFER_SIZE = 1 << 20
+
+
+def _gunzip(src, dst):
+    """把 gzip 文件 src 解压为 dst。"""
+    with gzip.open(src, 'rb') as f_in:
+        with open(dst, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, GUNZIP_BUFFER_SIZE)
+
+
+def _link_or_copy(src, dst):
+    """优先用硬链接把 src 放到 dst（同一文件系统时不复制数据），失败则复制。"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+@lru_cache(maxsize=1)
+def _locate_crx2rnx():
+    """查找 crx2rnx 可执行文件（PATH 中的命令名优先，其次常见安装路径）。
+
+    找到的路径在进程内缓存；未找到时抛出异常，lru_cache 不缓存异常，
+    之后安装或加入 PATH 仍可找到。
+
+    Raises:
+        FileNotFoundError: 未找到 crx2rnx
+    """
+    for cmd in CRX2RNX_CANDIDATES:
+        path = shutil.which(os.path.expanduser(cmd))
+        if path:
+            return path
+    raise FileNotFoundError("未找到 crx2rnx")
+
+
+def _find_crx2rnx():
+    """返回 crx2rnx 可执行文件路径，未找到返回 None。"""
+    try:
+        return _locate_crx2rnx()
+    except FileNotFoundError:
+        return None
 
 
 def decompress_crx_gz(crx_gz_path, output_dir):
     """解压 Compact RINEX (.crx.gz) 为标准 RINEX (.rnx)。
 
-    流程：.crx.gz → gunzip → .crx → crx2rnx → .rnx
+    流程：.crx.gz → gunzip → crx2rnx → .rnx
+    gunzip 的输出经管道直接送入 crx2rnx 的 stdin（不带文件名时 crx2rnx
+    读 stdin、写 stdout），中间的 .crx 不落盘。
 
     Args:
         crx_gz_path: Compact RINEX 压缩文件路径
@@ -33,50 +88,45 @@ def decompress_crx_gz(crx_gz_path, output_dir):
     Returns:
         解压后的 .rnx 文件路径，失败返回 None
     """
-    basename = os.path.basename(crx_gz_path)
-
-    # gunzip
-    crx_path = os.path.join(output_dir, basename.replace('.gz', ''))
-    try:
-        with gzip.open(crx_gz_path, 'rb') as f_in:
-            with open(crx_path, 'wb') as f_out:
-                shutil.copyfileobj(f_in, f_out)
-    except Exception:
+    crx2rnx = _find_crx2rnx()
+    if crx2rnx is None:
         return None
 
-    # crx2rnx（外部工具）
-    rnx_path = crx_path.replace('.crx', '.rnx')
+    basename = os.path.basename(crx_gz_path)
+    crx_name = basename.replace('.gz', '')
+    rnx_path = os.path.join(output_dir, crx_name.replace('.crx', '.rnx'))
+
+    returncode = None
     try:
-        result = subprocess.run(
-            ['CRX2RNX', crx_path],
-            capture_output=True, timeout=60
-        )
-        if result.returncode != 0:
-            # 尝试小写命令
-            subprocess.run(
-                ['crx2rnx', crx_path],
-                capture_output=True, timeout=60
-            )
-    except FileNotFoundError:
-        # crx2rnx 不在 PATH 中，尝试常见路径
-        for cmd in [os.path.expanduser('~/gg/bin/crx2rnx'),
-                    '/usr/local/bin/crx2rnx']:
-            if os.path.exists(cmd):
-                subprocess.run([cmd, crx_path], capture_output=True, timeout=60)
-                break
+        with open(rnx_path, 'wb') as f_out:
+            proc = subprocess.Popen([crx2rnx], stdin=subprocess.PIPE,
+                                    stdout=f_out, stderr=subprocess.DEVNULL)
+            try:
+                with gzip.open(crx_gz_path, 'rb') as f_in:
+                    shutil.copyfileobj(f_in, proc.stdin, GUNZIP_BUFFER_SIZE)
+            finally:
+                try:
+                    proc.stdin.close()
+                except OSError:
+                    pass
+                try:
+                    returncode = proc.wait(timeout=CRX2RNX_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.wait()
+                    returncode = None
     except Exception:
-        pass
+        returncode = None
 
-    # 清理中间文件
-    if os.path.exists(crx_path):
-        os.remove(crx_path)
-
-    if os.path.exists(rnx_path):
-        return rnx_path
-    return None
+    # crx2rnx 退出码：0 正常，2 仅有警告（输出仍可用），其余为错误
+    if returncode not in (0, 2):
+        if os.path.exists(rnx_path):
+            os.remove(rnx_path)
+        return None
+    return rnx_path
 
 
-def prepare_rinex(year, doy, data_dir, expt_dir, stations=None):
+def prepare_rinex(year, doy, data_dir, expt_dir, stations=None, workers=None):
     """预处理 RINEX 数据：解压、格式转换、短文件名生成。
 
     对每个站点执行：
@@ -85,12 +135,16 @@ def prepare_rinex(year, doy, data_dir, expt_dir, stations=None):
     3. 转换为 RINEX 2.11（调用 converter 模块）
     4. 生成 GAMIT 短文件名（如 mcm40010.25o）
 
+    各站互相独立：解压（gzip + crx2rnx 子进程）用线程池并发，
+    格式转换是纯 Python 计算，交给 convert_rinex3_to_rinex2_many 多进程执行。
+
     Args:
         year: 4 位年份
         doy: 年积日 (int)
         data_dir: 原始数据根目录（包含 year/doy 子目录）
         expt_dir: GAMIT 实验目录
         stations: 站点列表（None 表示自动检测）
+        workers: 格式转换进程数，None 表示 CPU 核数，1 表示串行
 
     Returns:
         成功处理的站点数
@@ -100,13 +154,12 @@ def prepare_rinex(year, doy, data_dir, expt_dir, stations=None):
     source_dir = os.path.join(data_dir, str(year), doy_str)
     os.makedirs(expt_dir, exist_ok=True)
 
-    station_count = 0
-
     # 查找所有 .crx.gz 文件
     crx_files = glob.glob(os.path.join(source_dir, '*_MO.crx.gz'))
     if not crx_files:
         crx_files = glob.glob(os.path.join(source_dir, '*.crx.gz'))
 
+    jobs = []
     for crx_gz in crx_files:
         basename = os.path.basename(crx_gz)
         # 从长文件名提取站点名
@@ -114,28 +167,46 @@ def prepare_rinex(year, doy, data_dir, expt_dir, stations=None):
 
         if stations and stn not in stations:
             continue
+        jobs.append((stn, crx_gz))
 
-        # 解压
-        rnx_path = decompress_crx_gz(crx_gz, expt_dir)
-        if not rnx_path:
-            continue
+    if not jobs:
+        return 0
 
-        # RINEX3 → RINEX2
-        rnx2_path = os.path.join(expt_dir, f"{stn}_rnx2.tmp")
-        if not convert_rinex3_to_rinex2(rnx_path, rnx2_path):
-            os.remove(rnx_path)
-            continue
-
-        # 生成 GAMIT 短文件名: ssss{doy}0.{yr2}o
-        short_name = f"{stn}{doy_str}0.{yr2}o"
-        short_path = os.path.join(expt_dir, short_name)
-        shutil.move(rnx2_path, short_path)
-
-        # 清理中间文件
-        if os.path.exists(rnx_path):
-            os.remove(rnx_path)
-
-        station_count += 1
+    # 解压（逐站取结果，单站出错只跳过该站）
+    decompressed = []
+    with ThreadPoolExecutor(max_workers=min(DECOMPRESS_WORKERS, len(jobs))) as pool:
+        futures = [(stn, pool.submit(decompress_crx_gz, crx_gz, expt_dir))
+                   for stn, crx_gz in jobs]
+        for stn, future in futures:
+            try:
+                rnx_path = future.result()
+            except Exception:
+                continue
+            if rnx_path:
+                decompressed.append((stn, rnx_path))
+
+    # RINEX3 → RINEX2（临时文件按 .rnx 命名，同站多个文件互不冲突）；
+    # 转换失败的站点跳过，无论成败都清理中间文件
+    pairs = [(rnx_path, f"{rnx_path}.rnx2.tmp") for _, rnx_path in decompressed]
+    station_count = 0
+    try:
+        converted = convert_rinex3_to_rinex2_many(pairs, workers=workers)
+        for (stn, _), (_, rnx2_path), ok in zip(decompressed, pairs, converted):
+            if not ok:
+                continue
+            # 生成 GAMIT 短文件名: ssss{doy}0.{yr2}o
+            short_name = f"{stn}{doy_str}0.{yr2}o"
+            short_path = os.path.join(expt_dir, short_name)
+            try:
+                shutil.move(rnx2_path, short_path)
+            except OSError:
+                continue
+            station_count += 1
+    finally:
+        for rnx_path, rnx2_path in pairs:
+            for path in (rnx_path, rnx2_path):
+                if os.path.exists(path):
+                    os.remove(path)
 
     return station_count
 
@@ -170,15 +241,12 @@ def prepare_products(year, doy, data_dir, expt_dir):
             basename = os.path.basename(src_file)
             dst = os.path.join(igs_dir, basename)
             if not os.path.exists(dst):
-                shutil.copy2(src_file, dst)
+                _link_or_copy(src_file, dst)
 
             # 解压 .gz
             if dst.endswith('.gz'):
                 try:
-                    decompressed = dst[:-3]
-                    with gzip.open(dst, 'rb') as f_in:
-                        with open(decompressed, 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
+                    _gunzip(dst, dst[:-3])
                     os.remove(dst)
                 except Exception:
                     pass
@@ -190,21 +258,23 @@ def prepare_products(year, doy, data_dir, expt_dir):
     sp3_files = glob.glob(os.path.join(igs_dir, 'IGS0OPSFIN_*ORB.SP3'))
     if sp3_files:
         sp3_short = os.path.join(igs_dir, f"igs{gps_week}{dow}.sp3")
-        if not os.path.exists(sp3_short):
-            try:
-                os.symlink(sp3_files[0], sp3_short)
-            except OSError:
-                shutil.copy2(sp3_files[0], sp3_short)
+        try:
+            os.symlink(sp3_files[0], sp3_short)
+        except FileExistsError:
+            pass
+        except OSError:
+            _link_or_copy(sp3_files[0], sp3_short)
 
     # CLK
     clk_files = glob.glob(os.path.join(igs_dir, 'IGS0OPSFIN_*CLK.CLK'))
     if clk_files:
         clk_short = os.path.join(igs_dir, f"igs{gps_week}{dow}.clk")
-        if not os.path.exists(clk_short):
-            try:
-                os.symlink(clk_files[0], clk_short)
-            except OSError:
-                shutil.copy2(clk_files[0], clk_short)
+        try:
+            os.symlink(clk_files[0], clk_short)
+        except FileExistsError:
+            pass
+        except OSError:
+            _link_or_copy(clk_files[0], clk_short)
 
     return count
 
@@ -241,14 +311,12 @@ def prepare_broadcast(year, doy, data_dir, expt_dir):
             src = matches[0]
             if src.endswith('.gz'):
                 try:
-                    with gzip.open(src, 'rb') as f_in:
-                        with open(brdc_path, 'wb') as f_out:
-                            shutil.copyfileobj(f_in, f_out)
+                    _gunzip(src, brdc_path)
                     return True
                 except Exception:
                     pass
             else:
-                shutil.copy2(src, brdc_path)
+                _link_or_copy(src, brdc_path)
                 return True
 
     return False
@@ -266,16 +334,18 @@ def link_tables(gg_dir, expt_dir, template_dir=None):
     os.makedirs(tables_dir, exist_ok=True)
 
     # 链接全局表
+    # 已存在的链接由 symlink 抛出 FileExistsError，无需逐个预先 stat
     global_tables = os.path.join(gg_dir, 'tables')
-    if os.path.isdir(global_tables):
-        for item in os.listdir(global_tables):
-            src = os.path.join(global_tables, item)
-            dst = os.path.join(tables_dir, item)
-            if not os.path.exists(dst):
+    try:
+        with os.scandir(global_tables) as it:
+            for entry in it:
                 try:
-                    os.symlink(src, dst)
+                    os.symlink(entry.path, os.path.join(tables_dir, entry.name))
                 except OSError:
                     pass
+    except OSError:
+        # 全局表目录不存在
+        pass
 
     # 复制本地配置
     if template_dir and os.path.isdir(template_dir):
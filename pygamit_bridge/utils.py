@@ -4,13 +4,52 @@ utils.py — 通用工具函数
 提供 GPS 时间系统转换、文件检测等基础功能。
 """
 
+import io
 import os
+import re
 import struct
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import NamedTuple
+from datetime import date, datetime
 
 
-# GPS 纪元起始时间 (1980-01-06)
+# GPS 纪元起始时间 (1980-01-06)；GPS_EPOCH 保留给需要 datetime 的调用方，
+# 模块内的周/日计算一律用其日序数 GPS_EPOCH_ORD (722820) 做整数运算
 GPS_EPOCH = datetime(1980, 1, 6)
+GPS_EPOCH_ORD = date(1980, 1, 6).toordinal()
+
+# gzip 魔数，以及文件类型检测读取的开头字节数
+GZIP_MAGIC = b'\x1f\x8b'
+HTML_SNIFF_SIZE = 512
+
+# open_and_sniff 的预读字节数：多数 RINEX 头与小文件一次读完
+SNIFF_PREFETCH_SIZE = 1 << 17
+
+# GAMIT 常见安装路径（按优先级）
+GAMIT_HOME_CANDIDATES = ('~/gg', '/opt/gg', '/usr/local/gg')
+
+# HTML 标签特征（<!doctype html / <html / <head，不区分大小写），一次扫描完成匹配
+HTML_TAG_RE = re.compile(rb'<(?:!doctype html|html|head)', re.IGNORECASE)
+
+# 批量文件类型检测的并发线程数，以及检测结果缓存的条目数
+CLASSIFY_WORKERS = 8
+CLASSIFY_CACHE_SIZE = 4096
+
+
+_pread = getattr(os, 'pread', None)
+
+
+class GpsWeek(NamedTuple):
+    """GPS 周与周内日（0=周日）；与 (gps_week, day_of_week) 元组兼容，可直接解包。"""
+    week: int
+    dow: int
+
+
+@lru_cache(maxsize=64)
+def _jan1_ordinal(year: int) -> int:
+    """返回 year 年 1 月 1 日的公历日序数（同一次处理通常只涉及一两个年份）。"""
+    return date(year, 1, 1).toordinal()
 
 
 def doy_to_date(year: int, doy: int) -> datetime:
@@ -23,7 +62,7 @@ def doy_to_date(year: int, doy: int) -> datetime:
     Returns:
         对应的 datetime 对象
     """
-    return datetime(year, 1, 1) + timedelta(days=doy - 1)
+    return datetime.fromordinal(_jan1_ordinal(year) + doy - 1)
 
 
 def date_to_doy(dt: datetime) -> tuple:
@@ -35,11 +74,38 @@ def date_to_doy(dt: datetime) -> tuple:
     Returns:
         (year, doy) 元组
     """
-    doy = dt.timetuple().tm_yday
-    return dt.year, doy
+    return dt.year, dt.toordinal() - _jan1_ordinal(dt.year) + 1
+
+
+def doy_to_date_many(years, doys) -> list:
+    """批量将年积日转换为日期对象（多站多日处理时避免逐条 timedelta 运算）。
+
+    每个年份的 1 月 1 日序数只计算一次，其余为整数加法。
+
+    Args:
+        years: 4 位年份序列
+        doys: 与 years 等长的年积日序列
+
+    Returns:
+        datetime 对象列表
+    """
+    return [datetime.fromordinal(_jan1_ordinal(year) + doy - 1)
+            for year, doy in zip(years, doys)]
 
 
-def date_to_gps_week(year: int, month: int, day: int) -> tuple:
+def date_to_doy_many(dts) -> list:
+    """批量将日期对象转换为 (year, doy)。
+
+    Args:
+        dts: date/datetime 对象序列
+
+    Returns:
+        (year, doy) 元组列表
+    """
+    return [(dt.year, dt.toordinal() - _jan1_ordinal(dt.year) + 1) for dt in dts]
+
+
+def date_to_gps_week(year: int, month: int, day: int) -> GpsWeek:
     """计算 GPS 周和周内日。
 
     Args:
@@ -48,16 +114,41 @@ def date_to_gps_week(year: int, month: int, day: int) -> tuple:
         day: 日 (1-31)
 
     Returns:
-        (gps_week, day_of_week) 元组，周内日 0=周日
+        GpsWeek(week, dow) 命名元组，周内日 0=周日
+    """
+    days = date(year, month, day).toordinal() - GPS_EPOCH_ORD
+    return GpsWeek(days // 7, days % 7)
+
+
+def date_to_gps_week_many(dates) -> list:
+    """批量计算 GPS 周和周内日（纯整数运算，不构造 timedelta）。
+
+    Args:
+        dates: date/datetime 对象序列
+
+    Returns:
+        (gps_week, day_of_week) 元组列表，周内日 0=周日
     """
-    dt = datetime(year, month, day)
-    delta = dt - GPS_EPOCH
-    gps_week = delta.days // 7
-    dow = delta.days % 7
-    return gps_week, dow
+    return gps_week_from_ordinals(dt.toordinal() for dt in dates)
+
 
+def gps_week_from_ordinals(ordinals) -> list:
+    """从公历日序数 (date.toordinal()) 批量计算 GPS 周和周内日。
 
-def doy_to_gps_week(year: int, doy: int) -> tuple:
+    多年连续时间序列可以先把日期存为整数日序数，
+    之后的周计算只剩一次整数减法和 divmod。
+
+    Args:
+        ordinals: 日序数序列
+
+    Returns:
+        (gps_week, day_of_week) 元组列表
+    """
+    epoch = GPS_EPOCH_ORD
+    return [divmod(ordinal - epoch, 7) for ordinal in ordinals]
+
+
+def doy_to_gps_week(year: int, doy: int) -> GpsWeek:
     """从年积日计算 GPS 周和周内日。
 
     Args:
@@ -65,10 +156,114 @@ def doy_to_gps_week(year: int, doy: int) -> tuple:
         doy: 年积日
 
     Returns:
-        (gps_week, day_of_week) 元组
+        GpsWeek(week, dow) 命名元组
+    """
+    days = _jan1_ordinal(year) + doy - 1 - GPS_EPOCH_ORD
+    return GpsWeek(days // 7, days % 7)
+
+
+def doy_to_gps_week_many(years, doys) -> list:
+    """批量从年积日计算 GPS 周和周内日。
+
+    Args:
+        years: 4 位年份序列
+        doys: 与 years 等长的年积日序列
+
+    Returns:
+        (gps_week, day_of_week) 元组列表
+    """
+    epoch = GPS_EPOCH_ORD
+    return [divmod(_jan1_ordinal(year) + doy - 1 - epoch, 7)
+            for year, doy in zip(years, doys)]
+
+
+def _read_header(filepath: str, size: int = HTML_SNIFF_SIZE) -> bytes:
+    """读取文件开头 size 字节（直接系统调用，不经过 Python 文件对象缓冲层）。
+
+    支持 os.pread 的平台按固定偏移 0 读取，不依赖文件读指针；
+    Windows 等无 pread 的平台退回 os.read。
+
+    Raises:
+        OSError: 文件无法打开或读取
+    """
+    fd = os.open(filepath, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if _pread is not None:
+            return _pread(fd, size, 0)
+        return os.read(fd, size)
+    finally:
+        os.close(fd)
+
+
+def classify_download(filepath: str) -> str:
+    """一次读取文件开头，判断下载结果的类型。
+
+    gzip 魔数与 HTML 标签检查共用同一次 open/read，
+    先后调用 is_gzip 和 is_html 时无需两次打开文件。
+
+    Args:
+        filepath: 文件路径
+
+    Returns:
+        'gzip'（合法 gzip）、'html'（认证重定向产生的登录页）、
+        'other'（其他内容）或 'missing'（文件无法读取）
+    """
+    try:
+        head = _read_header(filepath)
+    except OSError:
+        return 'missing'
+    if head[:2] == GZIP_MAGIC:
+        return 'gzip'
+    if is_html_bytes(head):
+        return 'html'
+    return 'other'
+
+
+@lru_cache(maxsize=CLASSIFY_CACHE_SIZE)
+def _classify_by_stat(filepath, mtime_ns, size):
+    """classify_download 的缓存层，键中的修改时间与大小保证文件变化后失效。"""
+    return classify_download(filepath)
+
+
+def classify_download_cached(filepath: str, st=None) -> str:
+    """带缓存的 classify_download：按 (路径, 修改时间, 大小) 复用已读结果。
+
+    同一文件在下载校验、解压、归档等环节被反复检查时，
+    之后的检查只需一次 stat。
+
+    Args:
+        filepath: 文件路径
+        st: 已有的 os.stat_result（如 DirEntry.stat()），None 时自行 stat
+
+    Returns:
+        同 classify_download
     """
-    dt = doy_to_date(year, doy)
-    return date_to_gps_week(dt.year, dt.month, dt.day)
+    if st is None:
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return 'missing'
+    return _classify_by_stat(filepath, st.st_mtime_ns, st.st_size)
+
+
+def classify_downloads(filepaths, workers: int = CLASSIFY_WORKERS) -> dict:
+    """批量判断下载结果类型（如下载完成后统一校验整个目录）。
+
+    每个文件只读开头一次；NFS 等高延迟存储上打开文件的等待占主要时间，
+    多个文件用线程并发读取。
+
+    Args:
+        filepaths: 文件路径序列
+        workers: 并发线程数，1 表示串行
+
+    Returns:
+        {路径: classify_download 结果} 字典，顺序与输入一致
+    """
+    filepaths = list(filepaths)
+    if workers == 1 or len(filepaths) <= 1:
+        return {fp: classify_download(fp) for fp in filepaths}
+    with ThreadPoolExecutor(max_workers=min(workers, len(filepaths))) as pool:
+        return dict(zip(filepaths, pool.map(classify_download, filepaths)))
 
 
 def is_gzip(filepath: str) -> bool:
@@ -83,12 +278,7 @@ def is_gzip(filepath: str) -> bool:
     Returns:
         True 如果是合法的 gzip 文件
     """
-    try:
-        with open(filepath, 'rb') as f:
-            magic = f.read(2)
-            return magic == b'\x1f\x8b'
-    except (IOError, OSError):
-        return False
+    return classify_download_cached(filepath) == 'gzip'
 
 
 def is_html(filepath: str) -> bool:
@@ -103,18 +293,98 @@ def is_html(filepath: str) -> bool:
     Returns:
         True 如果文件内容是 HTML
     """
+    return classify_download_cached(filepath) == 'html'
+
+
+def is_html_bytes(head: bytes) -> bool:
+    """检查一段文件/响应开头的字节是否为 HTML 页面。
+
+    Args:
+        head: 内容开头的字节（通常取 HTML_SNIFF_SIZE 字节）
+
+    Returns:
+        True 如果内容是 HTML
+    """
+    # 检查是否包含 HTML 标签
+    return HTML_TAG_RE.search(head) is not None
+
+
+def open_and_sniff(filepath: str, prefetch: int = SNIFF_PREFETCH_SIZE) -> tuple:
+    """一次大块读取文件开头，返回开头字节和可从头读取全文的二进制流。
+
+    先判断类型（gzip 魔数、RINEX 版本行等）再解析时不必反复打开/寻址：
+    不超过 prefetch 的小文件已整个读入内存，直接以 BytesIO 返回，
+    后续解析不再访问磁盘；大文件返回回到开头的已打开文件对象。
+
+    Args:
+        filepath: 文件路径
+        prefetch: 预读字节数
+
+    Returns:
+        (开头字节, 二进制流) 元组，流由调用方关闭
+
+    Raises:
+        OSError: 文件无法打开或读取
+    """
+    f = open(filepath, 'rb')
+    try:
+        head = f.read(prefetch)
+        if len(head) < prefetch:
+            f.close()
+            return head, io.BytesIO(head)
+        f.seek(0)
+    except Exception:
+        f.close()
+        raise
+    return head, f
+
+
+def iter_header_records(lines, labels):
+    """扫描 RINEX 头部，只产出关心的标签行。
+
+    RINEX 头部标签固定在第 61-80 列，每行只切片一次；
+    不在 labels 中的行（COMMENT 等）直接跳过。扫描在 END OF HEADER 处结束，
+    传入文件对象时读取位置恰好停在数据段开头。
+
+    Args:
+        lines: 头部行的可迭代对象（行列表或文件对象）
+        labels: 需要的标签集合
+
+    Yields:
+        (行号, 标签, 行内容) 元组，最后一个为 END OF HEADER 行
+    """
+    for i, line in enumerate(lines):
+        label = line[60:80].strip()
+        if label == 'END OF HEADER':
+            yield i, label, line
+            return
+        if label in labels:
+            yield i, label, line
+
+
+def _home_has_dir(name: str) -> bool:
+    """用 os.scandir 扫描 home，判断其中是否有名为 name 的目录。
+
+    只对名字匹配的条目调用 is_dir()（指向目录的符号链接也算），
+    目录项类型未知（DT_UNKNOWN，NFS 上常见）时也只多一次 stat。
+    不缓存结果，安装 GAMIT 或切换 HOME 后可再次查找。
+    home 不可列目录（如仅有执行权限）时退回 os.path.isdir 直接检查。
+
+    Args:
+        name: home 下的子目录名（如 'gg'）
+
+    Returns:
+        True 如果该目录存在
+    """
+    home = os.path.expanduser('~')
     try:
-        with open(filepath, 'rb') as f:
-            head = f.read(512)
-        # 检查是否包含 HTML 标签
-        head_lower = head.lower()
-        return (b'<!doctype html' in head_lower or
-                b'<html' in head_lower or
-                b'<head' in head_lower)
-    except (IOError, OSError):
-        return False
+        with os.scandir(home) as it:
+            return any(entry.name == name and entry.is_dir() for entry in it)
+    except OSError:
+        return os.path.isdir(os.path.join(home, name))
 
 
+@lru_cache(maxsize=1)
 def find_gamit_home() -> str:
     """自动检测 GAMIT 安装路径。
 
@@ -123,6 +393,9 @@ def find_gamit_home() -> str:
     2. ~/gg/
     3. /opt/gg/
 
+    找到的路径在进程内缓存（未找到时不缓存，安装后可再次查找）；
+    需要重新检测时调用 find_gamit_home.cache_clear()。
+
     Returns:
         GAMIT 安装根目录路径
 
@@ -134,12 +407,12 @@ def find_gamit_home() -> str:
     if gamit_home and os.path.isdir(gamit_home):
         return gamit_home
 
-    # 检查常见路径
-    for candidate in [
-        os.path.expanduser('~/gg'),
-        '/opt/gg',
-        '/usr/local/gg',
-    ]:
+    # 检查常见路径：~/ 下的候选扫描 home 目录项，其余用 os.path.isdir
+    for candidate in GAMIT_HOME_CANDIDATES:
+        if candidate.startswith('~/'):
+            if _home_has_dir(candidate[2:]):
+                return os.path.expanduser(candidate)
+            continue
         if os.path.isdir(candidate):
             return candidate
 
@@ -159,4 +432,6 @@ def station_name_short(long_name: str) -> str:
     Returns:
         4 字符小写站点名
     """
+    # str.lower() 对纯 ASCII 字符串走 CPython 的快速路径，
+    # 比 translate 查表或整数位运算都快，无需特殊处理
     return long_name[:4].lower()